@@ -16,293 +16,436 @@
 """A script for validating VAST request parameters."""
 
 import argparse
+import functools
 import json
 import re
+import string
+import sys
+from types import MappingProxyType
+from typing import Callable
 from typing import Dict
+from typing import FrozenSet
+from typing import Iterable
 from typing import List
+from typing import Mapping
+from typing import NamedTuple
 from typing import Tuple
 from typing import Union
 import urllib
 import urllib.parse
 
+# Scheme must be http(s) and the netloc non-empty; urlparse lowercases the
+# scheme, so it is matched case-insensitively here.
+_URL_RE = re.compile(r"\Ahttps?://([^/?#]+)", re.IGNORECASE)
+_PARAM_RE = re.compile(r"([a-zA-Z0-9_]+)=([^&]*)")
+_PARAM_NAME_CHARS = string.ascii_letters + string.digits + "_"
+_URL_LEADING_CHARS = "".join(map(chr, range(0x21)))
+_URL_REMOVED_CHARS = dict.fromkeys(map(ord, "\t\r\n"))
+_BOOL_VALUES = frozenset(("0", "1"))
+_MISSING_MSG_REQUIRED = "Missing required parameter"
+_MISSING_MSG_PROGRAMMATIC = "Missing required programmatic parameter"
+_ERROR_TEMPLATE = "  Parameter: %s\n    Type: %s\n    Message: %s\n"
+_WARNING_TEMPLATE = "  Parameter: %s\n    Message: %s\n"
 
-class VastRequestValidator:
-  """A class for validating VAST request strings."""
+_ParamRule = Mapping[str, Union[str, FrozenSet[str]]]
+# Parameter rules keyed by implementation type, category and parameter name.
+_RuleTable = Mapping[str, Mapping[str, Mapping[str, _ParamRule]]]
 
-  def __init__(self) -> None:
-    """Initializes the VastRequestValidator with parameter rules."""
-    self.param_rules: Dict[str, Dict[str, Dict[str, Union[str, List[str]]]]] = {
-        "web": {
-            "required": {
-                "correlator": {"type": "int"},
-                "description_url": {"type": "url"},
-                "env": {
-                    "type": "enum",
-                    "allowed_values": ["vp", "instream", "outstream"],
-                },
-                "gdfp_req": {"type": "int"},
-                "iu": {"type": "str"},
-                "output": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "vast",
-                        "xml_vast2",
-                        "xml_vast3",
-                        "xml_vast4",
-                    ],
-                },
-                "sz": {"type": "size"},
-                "unviewed_position_start": {"type": "int"},
-                "url": {"type": "url"},
-                "vpmute": {"type": "bool"},
-            },
-            "programmatic_required": {
-                "ott_placement": {"type": "int"},
-                "plcmt": {"type": "int"},
-                "vpa": {"type": "bool"},
-            },
-            "programmatic_recommended": {
-                "aconp": {"type": "bool"},
-                "dth": {"type": "int"},
-                "givn": {"type": "str"},
-                "hl": {"type": "str"},
-                "omid_p": {"type": "str"},
-                "vconp": {"type": "bool"},
-                "vid_d": {"type": "int"},
-                "vpos": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "preroll",
-                        "midroll",
-                        "postroll",
-                        "1",
-                        "2",
-                        "3",
-                        "0",
-                    ],
-                },
-                "wta": {"type": "int"},
-            },
+
+class ValidationIssue(NamedTuple):
+  """A single problem found in a VAST request.
+
+  Attributes:
+    parameter: The name of the offending parameter.
+    type: The kind of issue, e.g. "invalid" or "missing".
+    message: A human-readable description of the issue.
+  """
+
+  parameter: str
+  type: str
+  message: str
+
+
+# Records one issue; validators receive the bound append of the error list.
+_AddError = Callable[[ValidationIssue], None]
+# The present parameters, errors and warnings of a validated request.
+_ValidationResult = Tuple[
+    Dict[str, str], List[ValidationIssue], List[ValidationIssue]
+]
+
+
+# The same page and creative URLs recur across requests, so cache results.
+@functools.lru_cache(maxsize=4096)
+def _is_url(url_string: str) -> bool:
+  """Returns whether a string is an http(s) URL with a non-empty netloc."""
+  # Like urlparse, ignore leading controls and spaces and embedded tabs and
+  # newlines.
+  url_string = url_string.lstrip(_URL_LEADING_CHARS)
+  if "\t" in url_string or "\r" in url_string or "\n" in url_string:
+    url_string = url_string.translate(_URL_REMOVED_CHARS)
+  match = _URL_RE.match(url_string)
+  if match is None:
+    return False
+  netloc = match.group(1)
+  if "[" in netloc or "]" in netloc or not netloc.isascii():
+    # Rare IPv6 and internationalized hosts get urlparse's full validation.
+    try:
+      return bool(urllib.parse.urlparse(url_string).netloc)
+    except ValueError:
+      return False
+  return True
+
+
+def _validate_int(
+    param: str, rules: _ParamRule, value: str, add_error: _AddError
+) -> None:
+  """Validates that a parameter value is an integer."""
+  del rules  # Unused.
+  digits = value[1:] if value[:1] in ("+", "-") else value
+  # isdecimal() accepts the same digits as int() without raising on failure.
+  if not digits.isdecimal():
+    add_error(
+        ValidationIssue(param, "invalid", f"Expected integer, got '{value}'")
+    )
+
+
+def _validate_url(
+    param: str, rules: _ParamRule, value: str, add_error: _AddError
+) -> None:
+  """Validates that a parameter value is a well-formed URL."""
+  del rules  # Unused.
+  if not VastRequestValidator.validate_url(value):
+    add_error(ValidationIssue(param, "invalid", f"Invalid URL: '{value}'"))
+
+
+def _validate_enum(
+    param: str, rules: _ParamRule, value: str, add_error: _AddError
+) -> None:
+  """Validates that a parameter value is one of the allowed values."""
+  if value not in rules["allowed_values"]:
+    add_error(
+        ValidationIssue(
+            param,
+            "invalid",
+            f"Invalid value. Allowed values: {rules['allowed_values_msg']}",
+        )
+    )
+
+
+def _validate_size(
+    param: str, rules: _ParamRule, value: str, add_error: _AddError
+) -> None:
+  """Validates that a parameter value has the WIDTHxHEIGHT format."""
+  del rules  # Unused.
+  width, sep, height = value.partition("x")
+  # isdecimal() matches the same characters as the regex \d class.
+  if not (sep and width.isdecimal() and height.isdecimal()):
+    add_error(
+        ValidationIssue(
+            param, "invalid", "Expected format WIDTHxHEIGHT (e.g., 640x480)"
+        )
+    )
+
+
+def _validate_bool(
+    param: str, rules: _ParamRule, value: str, add_error: _AddError
+) -> None:
+  """Validates that a parameter value is 0 or 1."""
+  del rules  # Unused.
+  if value not in _BOOL_VALUES:
+    add_error(
+        ValidationIssue(param, "invalid", f"Expected 0 or 1, got '{value}'")
+    )
+
+
+def _validate_str(
+    param: str, rules: _ParamRule, value: str, add_error: _AddError
+) -> None:
+  """Accepts any non-empty string value."""
+  del param, rules, value, add_error  # Unused.
+
+
+_Validator = Callable[[str, _ParamRule, str, _AddError], None]
+
+_VALIDATORS: Dict[str, _Validator] = {
+    "int": _validate_int,
+    "url": _validate_url,
+    "enum": _validate_enum,
+    "size": _validate_size,
+    "bool": _validate_bool,
+    "str": _validate_str,
+}
+
+
+class _CompiledRules(NamedTuple):
+  """Rules of one implementation type, flattened for fast validation.
+
+  Attributes:
+    required: (keys, ordered_keys, error_message) for each group of required
+      parameters; the frozenset is used for the missing-parameter check and
+      the tuple keeps errors in rule order.
+    validators: The validator and rules for every parameter that is checked
+      when present.
+  """
+
+  required: Tuple[Tuple[FrozenSet[str], Tuple[str, ...], str], ...]
+  validators: Dict[str, Tuple[_Validator, _ParamRule]]
+
+
+def _read_only_rules(
+    param_rules: Dict[str, Dict[str, Dict[str, _ParamRule]]],
+) -> _RuleTable:
+  """Returns the parameter rules wrapped read-only at every level."""
+  return MappingProxyType({
+      implementation_type: MappingProxyType({
+          category: MappingProxyType(params)
+          for category, params in rules.items()
+      })
+      for implementation_type, rules in param_rules.items()
+  })
+
+
+def _enum_rule(*allowed_values: str) -> _ParamRule:
+  """Returns a read-only enum rule accepting the given values."""
+  return MappingProxyType({
+      "type": "enum",
+      "allowed_values": frozenset(allowed_values),
+      "allowed_values_msg": ", ".join(allowed_values),
+  })
+
+
+# Rules shared by many parameters. Like every level of _PARAM_RULES, they are
+# read-only so that one parameter's rule cannot be changed through another
+# parameter or validator instance that aliases it.
+_INT_RULE: _ParamRule = MappingProxyType({"type": "int"})
+_URL_RULE: _ParamRule = MappingProxyType({"type": "url"})
+_STR_RULE: _ParamRule = MappingProxyType({"type": "str"})
+_SIZE_RULE: _ParamRule = MappingProxyType({"type": "size"})
+_BOOL_RULE: _ParamRule = MappingProxyType({"type": "bool"})
+_ENV_RULE = _enum_rule("vp", "instream", "outstream")
+_OUTPUT_RULE = _enum_rule("vast", "xml_vast2", "xml_vast3", "xml_vast4")
+_VPOS_RULE = _enum_rule("preroll", "midroll", "postroll", "1", "2", "3", "0")
+
+_PARAM_RULES = _read_only_rules({
+    "web": {
+        "required": {
+            "correlator": _INT_RULE,
+            "description_url": _URL_RULE,
+            "env": _ENV_RULE,
+            "gdfp_req": _INT_RULE,
+            "iu": _STR_RULE,
+            "output": _OUTPUT_RULE,
+            "sz": _SIZE_RULE,
+            "unviewed_position_start": _INT_RULE,
+            "url": _URL_RULE,
+            "vpmute": _BOOL_RULE,
         },
-        "app": {
-            "required": {
-                "correlator": {"type": "int"},
-                "description_url": {"type": "url"},
-                "env": {
-                    "type": "enum",
-                    "allowed_values": ["vp", "instream", "outstream"],
-                },
-                "gdfp_req": {"type": "int"},
-                "iu": {"type": "str"},
-                "output": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "vast",
-                        "xml_vast2",
-                        "xml_vast3",
-                        "xml_vast4",
-                    ],
-                },
-                "sz": {"type": "size"},
-                "unviewed_position_start": {"type": "int"},
-                "url": {"type": "url"},
-                "vpmute": {"type": "bool"},
-            },
-            "programmatic_required": {
-                "idtype": {"type": "int"},
-                "is_lat": {"type": "bool"},
-                "ott_placement": {"type": "int"},
-                "plcmt": {"type": "int"},
-                "rdid": {"type": "str"},
-                "vpa": {"type": "bool"},
-            },
-            "programmatic_recommended": {
-                "aconp": {"type": "bool"},
-                "an": {"type": "str"},
-                "dth": {"type": "int"},
-                "givn": {"type": "str"},
-                "hl": {"type": "str"},
-                "msid": {"type": "str"},
-                "omid_p": {"type": "str"},
-                "pvid": {"type": "str"},
-                "sid": {"type": "str"},
-                "vconp": {"type": "bool"},
-                "vid_d": {"type": "int"},
-                "vpos": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "preroll",
-                        "midroll",
-                        "postroll",
-                        "1",
-                        "2",
-                        "3",
-                        "0",
-                    ],
-                },
-                "wta": {"type": "int"},
-            },
+        "programmatic_required": {
+            "ott_placement": _INT_RULE,
+            "plcmt": _INT_RULE,
+            "vpa": _BOOL_RULE,
         },
-        "ctv": {
-            "required": {
-                "correlator": {"type": "int"},
-                "env": {
-                    "type": "enum",
-                    "allowed_values": ["vp", "instream", "outstream"],
-                },
-                "gdfp_req": {"type": "int"},
-                "iu": {"type": "str"},
-                "output": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "vast",
-                        "xml_vast2",
-                        "xml_vast3",
-                        "xml_vast4",
-                    ],
-                },
-                "sz": {"type": "size"},
-                "url": {"type": "url"},
-            },
-            "programmatic_required": {
-                "idtype": {"type": "int"},
-                "is_lat": {"type": "bool"},
-                "ott_placement": {"type": "int"},
-                "plcmt": {"type": "int"},
-                "rdid": {"type": "str"},
-                "vpa": {"type": "bool"},
-                "vpmute": {"type": "bool"},
-            },
-            "programmatic_recommended": {
-                "aconp": {"type": "bool"},
-                "an": {"type": "str"},
-                "dth": {"type": "int"},
-                "givn": {"type": "str"},
-                "hl": {"type": "str"},
-                "msid": {"type": "str"},
-                "omid_p": {"type": "str"},
-                "sid": {"type": "str"},
-                "vconp": {"type": "bool"},
-                "vid_d": {"type": "int"},
-                "vpos": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "preroll",
-                        "midroll",
-                        "postroll",
-                        "1",
-                        "2",
-                        "3",
-                        "0",
-                    ],
-                },
-                "wta": {"type": "int"},
-            },
+        "programmatic_recommended": {
+            "aconp": _BOOL_RULE,
+            "dth": _INT_RULE,
+            "givn": _STR_RULE,
+            "hl": _STR_RULE,
+            "omid_p": _STR_RULE,
+            "vconp": _BOOL_RULE,
+            "vid_d": _INT_RULE,
+            "vpos": _VPOS_RULE,
+            "wta": _INT_RULE,
         },
-        "audio": {
-            "required": {
-                "ad_type": {"type": "str"},
-                "correlator": {"type": "int"},
-                "env": {
-                    "type": "enum",
-                    "allowed_values": ["vp", "instream", "outstream"],
-                },
-                "gdfp_req": {"type": "int"},
-                "iu": {"type": "str"},
-                "output": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "vast",
-                        "xml_vast2",
-                        "xml_vast3",
-                        "xml_vast4",
-                    ],
-                },
-                "url": {"type": "url"},
-            },
-            "programmatic_required": {
-                "idtype": {"type": "int"},
-                "is_lat": {"type": "bool"},
-                "plcmt": {"type": "int"},
-                "rdid": {"type": "str"},
-                "vpa": {"type": "bool"},
-                "vpmute": {"type": "bool"},
-            },
-            "programmatic_recommended": {
-                "aconp": {"type": "bool"},
-                "an": {"type": "str"},
-                "dth": {"type": "int"},
-                "givn": {"type": "str"},
-                "hl": {"type": "str"},
-                "msid": {"type": "str"},
-                "omid_p": {"type": "str"},
-                "sid": {"type": "str"},
-                "vconp": {"type": "bool"},
-                "vpos": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "preroll",
-                        "midroll",
-                        "postroll",
-                        "1",
-                        "2",
-                        "3",
-                        "0",
-                    ],
-                },
-                "wta": {"type": "int"},
-            },
+    },
+    "app": {
+        "required": {
+            "correlator": _INT_RULE,
+            "description_url": _URL_RULE,
+            "env": _ENV_RULE,
+            "gdfp_req": _INT_RULE,
+            "iu": _STR_RULE,
+            "output": _OUTPUT_RULE,
+            "sz": _SIZE_RULE,
+            "unviewed_position_start": _INT_RULE,
+            "url": _URL_RULE,
+            "vpmute": _BOOL_RULE,
         },
-        "doh": {
-            "required": {
-                "correlator": {"type": "int"},
-                "env": {
-                    "type": "enum",
-                    "allowed_values": ["vp", "instream", "outstream"],
-                },
-                "gdfp_req": {"type": "int"},
-                "iu": {"type": "str"},
-                "output": {
-                    "type": "enum",
-                    "allowed_values": [
-                        "vast",
-                        "xml_vast2",
-                        "xml_vast3",
-                        "xml_vast4",
-                    ],
-                },
-                "sz": {"type": "size"},
-                "url": {"type": "url"},
-                "vpmute": {"type": "bool"},
-            },
-            "programmatic_required": {
-                "idtype": {"type": "int"},
-                "is_lat": {"type": "bool"},
-                "plcmt": {"type": "int"},
-                "rdid": {"type": "str"},
-                "sid": {"type": "str"},
-                "venuetype": {"type": "int"},
-            },
-            "programmatic_recommended": {
-                "aconp": {"type": "bool"},
-                "an": {"type": "str"},
-                "dth": {"type": "int"},
-                "givn": {"type": "str"},
-                "hl": {"type": "str"},
-                "msid": {"type": "str"},
-                "omid_p": {"type": "str"},
-            },
+        "programmatic_required": {
+            "idtype": _INT_RULE,
+            "is_lat": _BOOL_RULE,
+            "ott_placement": _INT_RULE,
+            "plcmt": _INT_RULE,
+            "rdid": _STR_RULE,
+            "vpa": _BOOL_RULE,
         },
-    }
+        "programmatic_recommended": {
+            "aconp": _BOOL_RULE,
+            "an": _STR_RULE,
+            "dth": _INT_RULE,
+            "givn": _STR_RULE,
+            "hl": _STR_RULE,
+            "msid": _STR_RULE,
+            "omid_p": _STR_RULE,
+            "pvid": _STR_RULE,
+            "sid": _STR_RULE,
+            "vconp": _BOOL_RULE,
+            "vid_d": _INT_RULE,
+            "vpos": _VPOS_RULE,
+            "wta": _INT_RULE,
+        },
+    },
+    "ctv": {
+        "required": {
+            "correlator": _INT_RULE,
+            "env": _ENV_RULE,
+            "gdfp_req": _INT_RULE,
+            "iu": _STR_RULE,
+            "output": _OUTPUT_RULE,
+            "sz": _SIZE_RULE,
+            "url": _URL_RULE,
+        },
+        "programmatic_required": {
+            "idtype": _INT_RULE,
+            "is_lat": _BOOL_RULE,
+            "ott_placement": _INT_RULE,
+            "plcmt": _INT_RULE,
+            "rdid": _STR_RULE,
+            "vpa": _BOOL_RULE,
+            "vpmute": _BOOL_RULE,
+        },
+        "programmatic_recommended": {
+            "aconp": _BOOL_RULE,
+            "an": _STR_RULE,
+            "dth": _INT_RULE,
+            "givn": _STR_RULE,
+            "hl": _STR_RULE,
+            "msid": _STR_RULE,
+            "omid_p": _STR_RULE,
+            "sid": _STR_RULE,
+            "vconp": _BOOL_RULE,
+            "vid_d": _INT_RULE,
+            "vpos": _VPOS_RULE,
+            "wta": _INT_RULE,
+        },
+    },
+    "audio": {
+        "required": {
+            "ad_type": _STR_RULE,
+            "correlator": _INT_RULE,
+            "env": _ENV_RULE,
+            "gdfp_req": _INT_RULE,
+            "iu": _STR_RULE,
+            "output": _OUTPUT_RULE,
+            "url": _URL_RULE,
+        },
+        "programmatic_required": {
+            "idtype": _INT_RULE,
+            "is_lat": _BOOL_RULE,
+            "plcmt": _INT_RULE,
+            "rdid": _STR_RULE,
+            "vpa": _BOOL_RULE,
+            "vpmute": _BOOL_RULE,
+        },
+        "programmatic_recommended": {
+            "aconp": _BOOL_RULE,
+            "an": _STR_RULE,
+            "dth": _INT_RULE,
+            "givn": _STR_RULE,
+            "hl": _STR_RULE,
+            "msid": _STR_RULE,
+            "omid_p": _STR_RULE,
+            "sid": _STR_RULE,
+            "vconp": _BOOL_RULE,
+            "vpos": _VPOS_RULE,
+            "wta": _INT_RULE,
+        },
+    },
+    "doh": {
+        "required": {
+            "correlator": _INT_RULE,
+            "env": _ENV_RULE,
+            "gdfp_req": _INT_RULE,
+            "iu": _STR_RULE,
+            "output": _OUTPUT_RULE,
+            "sz": _SIZE_RULE,
+            "url": _URL_RULE,
+            "vpmute": _BOOL_RULE,
+        },
+        "programmatic_required": {
+            "idtype": _INT_RULE,
+            "is_lat": _BOOL_RULE,
+            "plcmt": _INT_RULE,
+            "rdid": _STR_RULE,
+            "sid": _STR_RULE,
+            "venuetype": _INT_RULE,
+        },
+        "programmatic_recommended": {
+            "aconp": _BOOL_RULE,
+            "an": _STR_RULE,
+            "dth": _INT_RULE,
+            "givn": _STR_RULE,
+            "hl": _STR_RULE,
+            "msid": _STR_RULE,
+            "omid_p": _STR_RULE,
+        },
+    },
+})
+
+
+def _compile_rules(
+    param_rules: _RuleTable,
+) -> Dict[Tuple[str, bool], _CompiledRules]:
+  """Flattens the rules of every implementation type for fast validation.
+
+  Args:
+    param_rules: The parameter rules, keyed by implementation type.
+
+  Returns:
+    The compiled rules keyed by (implementation_type, is_programmatic).
+  """
+  compiled = {}
+  for implementation_type, rules in param_rules.items():
+    for is_programmatic in (False, True):
+      categories = [("required", _MISSING_MSG_REQUIRED)]
+      if is_programmatic:
+        categories.append(("programmatic_required", _MISSING_MSG_PROGRAMMATIC))
+      required = tuple(
+          (
+              frozenset(rules.get(category, {})),
+              tuple(rules.get(category, {})),
+              error_message,
+          )
+          for category, error_message in categories
+      )
+      validators = {}
+      validated = [category for category, _ in categories]
+      validated.append("programmatic_recommended")
+      for category in validated:
+        for param, rule in rules.get(category, {}).items():
+          validators[param] = (_VALIDATORS[rule["type"]], rule)
+      compiled[(implementation_type, is_programmatic)] = _CompiledRules(
+          required=required, validators=validators
+      )
+  return compiled
+
+
+_COMPILED_RULES = _compile_rules(_PARAM_RULES)
+
+
+class VastRequestValidator:
+  """A class for validating VAST request strings."""
+
+  def __init__(self) -> None:
+    """Initializes the VastRequestValidator with the shared parameter rules."""
+    self.param_rules = _PARAM_RULES
+    self._compiled = _COMPILED_RULES
 
   @staticmethod
   def validate_url(url_string: str) -> bool:
     """Validates if a URL string is well-formed."""
-    try:
-      result = urllib.parse.urlparse(url_string)
-      return result.scheme in ("http", "https") and bool(result.netloc)
-    except ValueError:
+    if not isinstance(url_string, str):
       return False
+    return _is_url(url_string)
 
   def validate_vast_request(
       self,
@@ -310,110 +453,93 @@ class VastRequestValidator:
       implementation_type: str,
       is_programmatic: bool = False,
       decode_params: bool = False,
-  ) -> Tuple[Dict[str, str], List[Dict[str, str]]]:
+  ) -> _ValidationResult:
     """Validates a VAST request based on the implementation type."""
-    present_params: Dict[str, str] = {}
-    errors: List[Dict[str, str]] = []
-    warnings: List[Dict[str, str]] = []
     if implementation_type not in self.param_rules:
-      errors.append({
-          "parameter": "implementation_type",
-          "type": "invalid",
-          "message": (
-              f"Invalid implementation type: '{implementation_type}'. Allowed"
-              f" types are: {', '.join(self.param_rules.keys())}"
-          ),
-      })
-      return present_params, errors
-    for match in re.finditer(r"([a-zA-Z0-9_]+)=([^&]*)", vast_request):
-      param_name = match.group(1)
-      param_value = match.group(2)
-      if decode_params:
-        param_value = urllib.parse.unquote(param_value)
+      return {}, [self._invalid_implementation_type(implementation_type)], []
+    compiled = self._compiled[(implementation_type, bool(is_programmatic))]
+    return self._validate_compiled(compiled, vast_request, decode_params)
+
+  def validate_vast_requests(
+      self,
+      vast_requests: Iterable[str],
+      implementation_type: str,
+      is_programmatic: bool = False,
+      decode_params: bool = False,
+  ) -> List[_ValidationResult]:
+    """Validates many VAST requests of the same implementation type.
+
+    The rule tables are resolved once for the whole batch, so this is cheaper
+    than calling validate_vast_request for each request.
+    """
+    if implementation_type not in self.param_rules:
+      issue = self._invalid_implementation_type(implementation_type)
+      return [({}, [issue], []) for _ in vast_requests]
+    compiled = self._compiled[(implementation_type, bool(is_programmatic))]
+    validate_compiled = self._validate_compiled
+    return [
+        validate_compiled(compiled, vast_request, decode_params)
+        for vast_request in vast_requests
+    ]
+
+  def _invalid_implementation_type(
+      self, implementation_type: str
+  ) -> ValidationIssue:
+    """Returns the issue reported for an unknown implementation type."""
+    return ValidationIssue(
+        "implementation_type",
+        "invalid",
+        f"Invalid implementation type: '{implementation_type}'. Allowed"
+        f" types are: {', '.join(self.param_rules.keys())}",
+    )
+
+  @staticmethod
+  def _validate_compiled(
+      compiled: _CompiledRules, vast_request: str, decode_params: bool
+  ) -> _ValidationResult:
+    """Validates a VAST request against precompiled rules."""
+    present_params: Dict[str, str] = {}
+    errors: List[ValidationIssue] = []
+    warnings: List[ValidationIssue] = []
+    # Bound once to skip attribute lookups inside the loops below.
+    errors_append = errors.append
+    unquote = urllib.parse.unquote
+    for piece in vast_request.split("&"):
+      param_name, sep, param_value = piece.partition("=")
+      if not sep:
+        continue
+      if not param_name or param_name.strip(_PARAM_NAME_CHARS):
+        # Anything in front of the name, such as the "...?" of a full
+        # request URL or the "amp;" of an HTML-escaped "&amp;", is skipped.
+        match = _PARAM_RE.search(piece)
+        if match is None:
+          continue
+        param_name, param_value = match.group(1, 2)
+      if decode_params and "%" in param_value:
+        param_value = unquote(param_value)
       present_params[param_name] = param_value
 
-    def validate_param(
-        param: str, rules: Dict[str, Union[str, List[str]]], value: str
-    ) -> None:
-      """Validates a single parameter value based on its rules."""
-      if not value:
-        errors.append({
-            "parameter": param,
-            "type": "invalid",
-            "message": "Parameter value is empty",
-        })
-        return
-      param_type = rules["type"]
-      if param_type == "int":
-        try:
-          int(value)
-        except ValueError:
-          errors.append({
-              "parameter": param,
-              "type": "invalid",
-              "message": f"Expected integer, got '{value}'",
-          })
-      elif param_type == "url":
-        if not VastRequestValidator.validate_url(value):
-          errors.append({
-              "parameter": param,
-              "type": "invalid",
-              "message": f"Invalid URL: '{value}'",
-          })
-      elif param_type == "enum":
-        if value not in rules["allowed_values"]:
-          errors.append({
-              "parameter": param,
-              "type": "invalid",
-              "message": (
-                  "Invalid value. Allowed values:"
-                  f" {', '.join(rules['allowed_values'])}"
-              ),
-          })
-      elif param_type == "size":
-        if not re.match(r"^\d+x\d+$", value):
-          errors.append({
-              "parameter": param,
-              "type": "invalid",
-              "message": "Expected format WIDTHxHEIGHT (e.g., 640x480)",
-          })
-      elif param_type == "bool":
-        if value not in ("0", "1"):
-          errors.append({
-              "parameter": param,
-              "type": "invalid",
-              "message": f"Expected 0 or 1, got '{value}'",
-          })
-
-    rules = self.param_rules[implementation_type]
-    for param_dict, error_message, is_required in [
-        (rules.get("required", {}), "Missing required parameter", True),
-        (
-            rules.get("programmatic_required", {}),
-            "Missing required programmatic parameter",
-            is_programmatic,
-        ),
-        (
-            rules.get("programmatic_recommended", {}),
-            "Recommended programmatic parameter not found",
-            False,
-        ),
-    ]:
-      if not is_required and param_dict is rules.get(
-          "programmatic_required", {}
-      ):
+    for keys, ordered_keys, error_message in compiled.required:
+      missing = keys - present_params.keys()
+      if missing:
+        for param in ordered_keys:
+          if param in missing:
+            errors_append(ValidationIssue(param, "missing", error_message))
+    # Walk the parameters in request order rather than intersecting key sets
+    # so that the reported errors stay deterministic.
+    get_validator = compiled.validators.get
+    for param, value in present_params.items():
+      entry = get_validator(param)
+      if entry is None:
         continue
-      for param, param_rules in param_dict.items():
-        if param not in present_params:
-          if is_required:
-            errors.append({
-                "parameter": param,
-                "type": "missing",
-                "message": error_message,
-            })
-        else:
-          validate_param(param, param_rules, present_params[param])
-    return present_params, errors + warnings
+      if not value:
+        errors_append(
+            ValidationIssue(param, "invalid", "Parameter value is empty")
+        )
+      else:
+        validator, param_rules = entry
+        validator(param, param_rules, value, errors_append)
+    return present_params, errors, warnings
 
 
 def main():
@@ -454,44 +580,37 @@ def main():
   validator = VastRequestValidator()
   is_programmatic = args.programmatic
   implementation_type = args.implementation_type.lower()
-  present_params, issues = validator.validate_vast_request(
+  present_params, errors, warnings = validator.validate_vast_request(
       args.vast_request, implementation_type, is_programmatic, args.decode
   )
-  errors = [
-      issue for issue in issues if issue.get("type") in ("invalid", "missing")
-  ]
-  warnings = [
-      issue
-      for issue in issues
-      if issue.get("type") not in ("invalid", "missing")
-  ]
   if args.json:
     output = {
         "valid": not errors,
-        "errors": errors,
-        "warnings": warnings,
+        "errors": [error._asdict() for error in errors],
+        "warnings": [warning._asdict() for warning in warnings],
         "present_parameters": present_params,
     }
     print(json.dumps(output, indent=4))
   else:
+    parts = []
     if not args.quiet:
-      print("\n--- Validation Results ---")
-      print(f"Implementation Type: {implementation_type}")
-      print(f"Present Parameters: {', '.join(present_params) or 'None'}")
+      parts.append("\n--- Validation Results ---\n")
+      parts.append(f"Implementation Type: {implementation_type}\n")
+      parts.append(
+          f"Present Parameters: {', '.join(present_params) or 'None'}\n"
+      )
     if errors:
-      print("\n--- Errors ---")
-      for error in errors:
-        print(f"  Parameter: {error['parameter']}")
-        if "type" in error:
-          print(f"    Type: {error['type']}")
-        print(f"    Message: {error['message']}")
+      parts.append("\n--- Errors ---\n")
+      parts.extend(_ERROR_TEMPLATE % error for error in errors)
     if warnings and not args.quiet:
-      print("\n--- Warnings ---")
-      for warning in warnings:
-        print(f"  Parameter: {warning['parameter']}")
-        print(f"    Message: {warning['message']}")
+      parts.append("\n--- Warnings ---\n")
+      parts.extend(
+          _WARNING_TEMPLATE % (warning.parameter, warning.message)
+          for warning in warnings
+      )
     if not errors and not args.quiet:
-      print("No errors found.")
+      parts.append("No errors found.\n")
+    sys.stdout.write("".join(parts))
 
 
 if __name__ == "__main__":
@@ -27,6 +27,14 @@ class TestVastRequestValidator(unittest.TestCase):
     super().setUp()
     self.validator = VastRequestValidator()
 
+  def test_param_rules_read_only(self):
+    with self.assertRaises(TypeError):
+      self.validator.param_rules["web"]["required"]["foo"] = {"type": "str"}
+    with self.assertRaises(TypeError):
+      self.validator.param_rules["foo"] = {}
+    required = VastRequestValidator().param_rules["web"]["required"]
+    self.assertNotIn("foo", required)
+
   def test_validate_url_valid(self):
     self.assertTrue(VastRequestValidator.validate_url("http://example.com"))
     self.assertTrue(
@@ -39,61 +47,119 @@ class TestVastRequestValidator(unittest.TestCase):
     self.assertFalse(VastRequestValidator.validate_url("not a url"))
     self.assertFalse(VastRequestValidator.validate_url("example.com"))
     self.assertFalse(VastRequestValidator.validate_url("ftp://example.com"))
+    self.assertFalse(VastRequestValidator.validate_url("http://"))
+    self.assertFalse(VastRequestValidator.validate_url("https:///path"))
+
+  def test_validate_url_matches_urlparse(self):
+    self.assertFalse(VastRequestValidator.validate_url("http://[::1"))
+    self.assertFalse(VastRequestValidator.validate_url("http://::1]/"))
+    self.assertTrue(VastRequestValidator.validate_url("http://[::1]/path"))
+    self.assertTrue(VastRequestValidator.validate_url(" http://example.com"))
+    self.assertTrue(VastRequestValidator.validate_url("ht\ttp://example.com"))
+
+  def test_validate_url_scheme_case_insensitive(self):
+    self.assertTrue(VastRequestValidator.validate_url("HTTPS://example.com"))
 
   def test_validate_vast_request_web_required(self):
     vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "web"
     )
     self.assertEqual(len(errors), 0)
 
   def test_validate_vast_request_web_missing_required(self):
     vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "web"
     )
     self.assertEqual(len(errors), 1)
-    self.assertEqual(errors[0]["parameter"], "vpmute")
+    self.assertEqual(errors[0].parameter, "vpmute")
 
   def test_validate_vast_request_web_invalid_param_type(self):
     vast_request = "correlator=abc&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
+        vast_request, "web"
+    )
+    self.assertEqual(len(errors), 1)
+    self.assertEqual(errors[0].parameter, "correlator")
+
+  def test_validate_vast_request_full_url(self):
+    vast_request = "https://pubads.g.doubleclick.net/gampad/ads?correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com/?a=b&vpmute=0&&flag"
+    present_params, errors, _ = self.validator.validate_vast_request(
+        vast_request, "web"
+    )
+    self.assertEqual(len(errors), 0)
+    self.assertEqual(present_params["correlator"], "123")
+    self.assertEqual(present_params["url"], "http://example.com/?a=b")
+    self.assertNotIn("flag", present_params)
+
+  def test_validate_vast_request_invalid_enum(self):
+    vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=json&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0"
+    _, errors, _ = self.validator.validate_vast_request(
+        vast_request, "web"
+    )
+    self.assertEqual(len(errors), 1)
+    self.assertEqual(errors[0].parameter, "output")
+    self.assertEqual(
+        errors[0].message,
+        "Invalid value. Allowed values: vast, xml_vast2, xml_vast3, xml_vast4",
+    )
+
+  def test_validate_vast_request_empty_value(self):
+    vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0"
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "web"
     )
     self.assertEqual(len(errors), 1)
-    self.assertEqual(errors[0]["parameter"], "correlator")
+    self.assertEqual(errors[0].parameter, "iu")
+    self.assertEqual(errors[0].message, "Parameter value is empty")
+
+  def test_validate_vast_request_signed_int(self):
+    vast_request = "correlator=-123&description_url=http://example.com&env=vp&gdfp_req=+1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=-&url=http://example.com&vpmute=0"
+    _, errors, _ = self.validator.validate_vast_request(
+        vast_request, "web"
+    )
+    self.assertEqual(len(errors), 1)
+    self.assertEqual(errors[0].parameter, "unviewed_position_start")
 
   def test_validate_vast_request_web_programmatic_required(self):
     vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0&ott_placement=1&plcmt=2&vpa=1"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "web", is_programmatic=True
     )
     self.assertEqual(len(errors), 0)
 
+  def test_validate_vast_request_programmatic_params_ignored(self):
+    vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0&vpa=abc"
+    _, errors, _ = self.validator.validate_vast_request(
+        vast_request, "web"
+    )
+    self.assertEqual(len(errors), 0)
+
   def test_validate_vast_request_app_required(self):
     vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "app"
     )
     self.assertEqual(len(errors), 0)
 
   def test_validate_vast_request_app_programmatic_required(self):
     vast_request = "correlator=123&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0&idtype=1&is_lat=0&ott_placement=1&plcmt=2&rdid=test_rdid&vpa=1"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "app", is_programmatic=True
     )
     self.assertEqual(len(errors), 0)
 
   def test_validate_vast_request_ctv_required(self):
     vast_request = "correlator=123&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&url=http://example.com"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "ctv"
     )
     self.assertEqual(len(errors), 0)
 
   def test_validate_vast_request_ctv_programmatic_required(self):
     vast_request = "correlator=123&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&url=http://example.com&idtype=1&is_lat=0&ott_placement=1&plcmt=2&rdid=test_rdid&vpa=1&vpmute=0"
-    _, errors = self.validator.validate_vast_request(
+    _, errors, _ = self.validator.validate_vast_request(
         vast_request, "ctv", is_programmatic=True
     )
     self.assertEqual(len(errors), 0)
@@ -146,3 +212,78 @@ class TestVastRequestValidator(unittest.TestCase):
         result = json.loads(output)
         self.assertTrue(result["valid"])
         self.assertEqual(len(result["errors"]), 0)
+
+  def test_main_json_output_errors(self):
+    with mock.patch(
+        "sys.argv",
+        [
+            "vast_request_validator.py",
+            "correlator=abc&description_url=http://example.com&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&unviewed_position_start=1&url=http://example.com&vpmute=0",
+            "-i",
+            "web",
+            "-j",
+        ],
+    ):
+      with mock.patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+        main()
+        output = mock_stdout.getvalue()
+        result = json.loads(output)
+        self.assertFalse(result["valid"])
+        self.assertEqual(
+            result["errors"],
+            [{
+                "parameter": "correlator",
+                "type": "invalid",
+                "message": "Expected integer, got 'abc'",
+            }],
+        )
+
+  def test_validate_vast_requests_batch(self):
+    valid_request = "correlator=123&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&url=http://example.com"
+    invalid_request = "correlator=abc&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480"
+    results = self.validator.validate_vast_requests(
+        [valid_request, invalid_request], "ctv"
+    )
+    self.assertEqual(len(results), 2)
+    self.assertEqual(results[0][1], [])
+    self.assertEqual(
+        [(error.parameter, error.type) for error in results[1][1]],
+        [("url", "missing"), ("correlator", "invalid")],
+    )
+
+  def test_validate_vast_request_decode_params(self):
+    vast_request = "correlator=123&env=vp&gdfp_req=1&iu=%2F123%2Fexample&output=vast&sz=640x480&url=http%3A%2F%2Fexample.com"
+    present_params, errors, _ = self.validator.validate_vast_request(
+        vast_request, "ctv", decode_params=True
+    )
+    self.assertEqual(len(errors), 0)
+    self.assertEqual(present_params["iu"], "/123/example")
+    self.assertEqual(present_params["url"], "http://example.com")
+
+  def test_validate_vast_request_invalid_size(self):
+    for size in ("640x", "x480", "640x480x1", "640*480", "640X480"):
+      vast_request = f"correlator=123&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz={size}&url=http://example.com"
+      _, errors, _ = self.validator.validate_vast_request(vast_request, "ctv")
+      self.assertEqual(len(errors), 1, size)
+      self.assertEqual(errors[0].parameter, "sz")
+
+  def test_validate_url_non_string(self):
+    self.assertFalse(VastRequestValidator.validate_url(None))
+    self.assertFalse(VastRequestValidator.validate_url(["http://example.com"]))
+
+  def test_validate_vast_request_html_escaped(self):
+    vast_request = " https://pubads.g.doubleclick.net/gampad/ads?correlator=123&amp;env=vp&amp;gdfp_req=1&amp;iu=/123/example&amp;output=vast&amp;sz=640x480&amp;url=http://example.com"
+    present_params, errors, _ = self.validator.validate_vast_request(
+        vast_request, "ctv"
+    )
+    self.assertEqual(len(errors), 0)
+    self.assertEqual(present_params["env"], "vp")
+    self.assertNotIn("amp;env", present_params)
+
+  def test_validate_vast_request_name_prefix_skipped(self):
+    vast_request = "x.correlator=123&env=vp&gdfp_req=1&iu=/123/example&output=vast&sz=640x480&url=http://example.com"
+    present_params, errors, _ = self.validator.validate_vast_request(
+        vast_request, "ctv"
+    )
+    self.assertEqual(len(errors), 0)
+    self.assertEqual(present_params["correlator"], "123")